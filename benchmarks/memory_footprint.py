@@ -0,0 +1,114 @@
+"""
+Memory footprint of in-flight project submissions.
+
+Builds N submissions with a couple of uploaded files each, once as the plain
+dicts the handlers used to keep in user_data and once as Project/FileMetadata
+records, and reports the traced allocation per conversation. Also times the
+BSON round trip used at the save_project boundary.
+
+    python -m benchmarks.memory_footprint --conversations 100000 --files 2
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import datetime
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TELEGRAM_TOKEN', 'benchmark')  # config requires a token, no connection is made
+
+from database.models import Project, FileMetadata  # noqa: E402
+
+
+def build_dict_project(user_id: int, files: int) -> dict:
+    """ Build a submission the way the handlers stored it before the records """
+    project_id = str(uuid.uuid4())
+    return {
+        'project_id': project_id,
+        'user_id': user_id,
+        'username': f"user{user_id}",
+        'files': [
+            {
+                'file_id': f"file-{user_id}-{i}",
+                'name': f"brief_{i}.pdf",
+                'mime_type': 'application/pdf',
+                'size': 1024 * (i + 1),
+                'type': 'document',
+                'uploaded_by': user_id,
+                'local_path': f"uploads/{user_id}/{project_id}/brief_{i}.pdf",
+                'download_success': True
+            }
+            for i in range(files)
+        ],
+        'status': 'new',
+        'created_at': datetime.datetime.utcnow(),
+        'name': 'Marketing Website',
+        'summary': 'Need a new responsive website'
+    }
+
+
+def build_record_project(user_id: int, files: int) -> Project:
+    """ Build the same submission as Project/FileMetadata records """
+    project_id = str(uuid.uuid4())
+    return Project(
+        project_id=project_id,
+        user_id=user_id,
+        username=f"user{user_id}",
+        name='Marketing Website',
+        summary='Need a new responsive website',
+        files=[
+            FileMetadata(
+                file_id=f"file-{user_id}-{i}",
+                name=f"brief_{i}.pdf",
+                mime_type='application/pdf',
+                size=1024 * (i + 1),
+                type='document',
+                uploaded_by=user_id,
+                local_path=f"uploads/{user_id}/{project_id}/brief_{i}.pdf",
+                download_success=True
+            )
+            for i in range(files)
+        ]
+    )
+
+
+def measure(builder, conversations: int, files: int) -> tuple:
+    """ Return (bytes per conversation, built objects) for a builder """
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    projects = [builder(user_id, files) for user_id in range(conversations)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / conversations, projects
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--conversations', type=int, default=100_000)
+    parser.add_argument('--files', type=int, default=2)
+    args = parser.parse_args()
+
+    dict_bytes, _ = measure(build_dict_project, args.conversations, args.files)
+    record_bytes, projects = measure(build_record_project, args.conversations, args.files)
+
+    print(f"{args.conversations} in-flight submissions, {args.files} files each")
+    print(f"  dict:    {dict_bytes:8.0f} bytes/conversation  {dict_bytes * args.conversations / 2**20:8.1f} MiB total")
+    print(f"  records: {record_bytes:8.0f} bytes/conversation  {record_bytes * args.conversations / 2**20:8.1f} MiB total")
+    print(f"  saving:  {1 - record_bytes / dict_bytes:8.1%}")
+
+    start = time.perf_counter()
+    encoded = [project.to_bson() for project in projects]
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for data in encoded:
+        Project.from_bson(data)
+    decode_time = time.perf_counter() - start
+
+    print(f"  bson encode: {encode_time / len(projects) * 1e6:6.2f} us/project")
+    print(f"  bson decode: {decode_time / len(projects) * 1e6:6.2f} us/project")
+
+
+if __name__ == '__main__':
+    main()
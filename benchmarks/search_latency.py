@@ -0,0 +1,119 @@
+"""
+Search latency over a large synthetic corpus.
+
+Generates N project documents with random names, summaries and file names,
+then reports query latency of the in-process inverted index, of cached hits
+through ProjectSearch and, with --mongo, of the MongoDB text index (the
+corpus is written to a scratch database that is dropped afterwards).
+
+    python -m benchmarks.search_latency --projects 200000 --queries 2000
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import datetime
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TELEGRAM_TOKEN', 'benchmark')  # config requires a token
+
+from database.search import InvertedIndex, ProjectSearch, FIELD_WEIGHTS, RESULT_PROJECTION  # noqa: E402
+
+WORDS = [
+    'marketing', 'website', 'mobile', 'app', 'redesign', 'landing', 'page', 'campaign', 'brand', 'logo',
+    'ecommerce', 'store', 'dashboard', 'analytics', 'crm', 'integration', 'api', 'backend', 'payment',
+    'booking', 'restaurant', 'clinic', 'school', 'portal', 'blog', 'newsletter', 'chatbot', 'telegram',
+    'inventory', 'warehouse', 'logistics', 'delivery', 'fitness', 'travel', 'hotel', 'real', 'estate',
+    'finance', 'invoice', 'accounting', 'hr', 'recruitment', 'video', 'podcast', 'game', 'education',
+] + [f"term{i}" for i in range(2000)]  # long tail
+
+
+def make_document(rng: random.Random) -> dict:
+    """ Build a synthetic project document """
+    return {
+        'project_id': str(uuid.uuid4()),
+        'user_id': rng.randrange(1, 1_000_000),
+        'name': ' '.join(rng.choices(WORDS, k=3)).title(),
+        'summary': ' '.join(rng.choices(WORDS, k=20)),
+        'files': [{'name': f"{rng.choice(WORDS)}_brief.pdf"} for _ in range(rng.randrange(0, 3))],
+        'status': rng.choice(['new', 'in_review', 'accepted']),
+        'created_at': datetime.datetime.utcnow()
+    }
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    return f"p50 {p50 * 1e3:7.3f} ms  p99 {p99 * 1e3:7.3f} ms"
+
+
+def time_queries(search, queries: list) -> list:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_mongo(corpus: list, queries: list, limit: int) -> None:
+    """ Time $text queries against a scratch MongoDB database """
+    from pymongo import MongoClient, TEXT
+    from config import MONGODB_URI
+
+    client = MongoClient(MONGODB_URI)
+    db_name = f"search_benchmark_{uuid.uuid4().hex[:8]}"
+    collection = client[db_name]['projects']
+    try:
+        collection.insert_many([dict(document) for document in corpus])
+        collection.create_index([(field, TEXT) for field in FIELD_WEIGHTS], weights=FIELD_WEIGHTS)
+        projection = dict(RESULT_PROJECTION, score={'$meta': 'textScore'})
+
+        def search(query):
+            return list(collection.find({'$text': {'$search': query}}, projection)
+                        .sort([('score', {'$meta': 'textScore'})]).limit(limit))
+
+        print(f"  mongo text index:  {percentiles(time_queries(search, queries))}")
+    finally:
+        client.drop_database(db_name)
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--projects', type=int, default=200_000)
+    parser.add_argument('--queries', type=int, default=2_000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--mongo', action='store_true', help="also benchmark the MongoDB text index")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    corpus = [make_document(rng) for _ in range(args.projects)]
+    # mostly common terms, as staff would search, with some long tail ones
+    queries = [' '.join(rng.choices(WORDS[:45] if rng.random() < 0.8 else WORDS, k=rng.randrange(1, 4)))
+               for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = InvertedIndex()
+    for document in corpus:
+        index.add(document)
+    print(f"{args.projects} projects, {args.queries} queries")
+    print(f"  index build:       {time.perf_counter() - start:7.2f} s")
+
+    print(f"  inverted index:    {percentiles(time_queries(lambda q: index.search(q, args.limit), queries))}")
+
+    search = ProjectSearch(backend='memory', cache_size=len(queries), cache_ttl=3600, index=index)
+    for query in queries:
+        search.search(query, args.limit)  # warm the cache
+    print(f"  cached hits:       {percentiles(time_queries(lambda q: search.search(q, args.limit), queries))}")
+
+    if args.mongo:
+        bench_mongo(corpus, queries, args.limit)
+
+
+if __name__ == '__main__':
+    main()
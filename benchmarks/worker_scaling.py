@@ -0,0 +1,108 @@
+"""
+Throughput of the supervisor mode as the worker count grows.
+
+Dispatches synthetic updates from many users through Supervisor to worker
+processes that do the CPU-bound part of a submission step (decode the update,
+build and validate a project, BSON-encode it, format a log line) and reports
+updates per second for each worker count. Telegram API calls are left out.
+
+    python -m benchmarks.worker_scaling --updates 50000 --workers 1 2 4 8
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import functools
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('TELEGRAM_TOKEN', 'benchmark')  # config requires a token, no connection is made
+
+from supervisor import Supervisor  # noqa: E402
+from database.models import Project, FileMetadata  # noqa: E402
+from utils.helpers import extract_project_info  # noqa: E402
+
+logger = logging.getLogger('benchmark')
+
+
+def make_update(update_id: int, user_id: int) -> dict:
+    """ Build a raw update shaped like a /basicinfo message """
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': {'id': user_id, 'is_bot': False, 'first_name': 'User', 'username': f"user{user_id}"},
+            'text': f"/basicinfo Project {update_id} - " + "Need a new responsive website " * 8
+        }
+    }
+
+
+def handle_update(data: dict, rounds: int) -> None:
+    """ CPU-bound stand-in for a handler step """
+    for _ in range(rounds):
+        message = json.loads(json.dumps(data))['message']
+        user = message['from']
+        name, summary = extract_project_info(message['text'][len('/basicinfo'):].strip())
+        project = Project(project_id=str(data['update_id']), user_id=user['id'], username=user['username'],
+                          name=name, summary=summary)
+        project.files.append(FileMetadata(f"file-{data['update_id']}", 'brief.pdf', 'application/pdf',
+                                          1024, 'document', uploaded_by=user['id']))
+        Project.from_bson(project.to_bson())
+        logger.debug(f"User {user['id']} submitted basic project info: {name}")
+
+
+def benchmark_worker(index: int, queue, workers: int, ready, rounds: int) -> None:
+    """ Worker entry point: handle updates until the stop signal """
+    ready.put(index)
+    while True:
+        data = queue.get()
+        if data is None:
+            break
+        handle_update(data, rounds)
+
+
+def run(workers: int, updates: list, rounds: int) -> float:
+    """ Return updates per second with the given worker count """
+    ready = multiprocessing.get_context('spawn').Queue()
+    target = functools.partial(benchmark_worker, ready=ready, rounds=rounds)
+    supervisor = Supervisor(workers, target=target, shutdown_timeout=600)
+    supervisor.start()
+    for _ in range(workers):
+        ready.get()  # exclude process start-up
+
+    start = time.perf_counter()
+    for user_id, data in updates:
+        supervisor.dispatch(user_id, data)
+    supervisor.stop()  # returns once every queue has been drained
+    return len(updates) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--updates', type=int, default=50_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--rounds', type=int, default=5, help="handler work repetitions per update")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    updates = []
+    for update_id in range(args.updates):
+        user_id = rng.randrange(1, args.users + 1)
+        updates.append((user_id, make_update(update_id, user_id)))
+
+    print(f"{args.updates} updates from {args.users} users, {os.cpu_count()} CPUs")
+    baseline = None
+    for workers in args.workers:
+        throughput = run(workers, updates, args.rounds)
+        baseline = baseline or throughput
+        print(f"  {workers:2d} workers: {throughput:10.0f} updates/s  ({throughput / baseline:4.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
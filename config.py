@@ -12,6 +12,27 @@ if not TELEGRAM_TOKEN:
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
 DB_NAME = os.getenv('DB_NAME', 'project_bot_db')
 PROJECTS_COLLECTION = 'projects'
+STATS_COLLECTION = 'project_stats'
+
+# Staff allowed to use admin commands, comma separated Telegram user IDs
+ADMIN_USER_IDS = {int(user_id) for user_id in os.getenv('ADMIN_USER_IDS', '').split(',') if user_id.strip()}
+
+# Search settings
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'mongo')  # 'mongo' text index or 'memory' in-process index
+SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', 10))
+SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 256))  # cached queries
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 60))  # seconds, bounds staleness across workers
+
+# Session settings
+SESSION_IDLE_TIMEOUT = int(os.getenv('SESSION_IDLE_TIMEOUT', 30 * 60))  # seconds before an abandoned submission is evicted
+SESSION_SWEEP_INTERVAL = int(os.getenv('SESSION_SWEEP_INTERVAL', 60))  # seconds between eviction sweeps
+SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', 64 * 1024 * 1024))  # resident size before spilling to disk, shared by all workers
+SESSION_SPILL_FOLDER = os.getenv('SESSION_SPILL_FOLDER', 'sessions')
+
+# Worker settings
+WORKER_COUNT = int(os.getenv('WORKER_COUNT', 1))  # 1 runs the bot in a single process
+WORKER_SHUTDOWN_TIMEOUT = int(os.getenv('WORKER_SHUTDOWN_TIMEOUT', 30))  # seconds to drain a worker before killing it
+POLL_TIMEOUT = int(os.getenv('POLL_TIMEOUT', 10))  # long polling timeout of the update receiver
 
 # Logging settings
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
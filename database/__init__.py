@@ -1,4 +1,8 @@
 from database.connection import db_connection
-from database.models import ProjectModel
+from database.models import ProjectModel, Project, FileMetadata
+from database.session_store import SessionStore
+from database.search import project_search, ProjectSearch
+from database.stats import StatsModel
 
-__all__ = ['db_connection', 'ProjectModel']
\ No newline at end of file
+__all__ = ['db_connection', 'ProjectModel', 'Project', 'FileMetadata', 'SessionStore',
+           'project_search', 'ProjectSearch', 'StatsModel']
\ No newline at end of file
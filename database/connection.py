@@ -3,7 +3,7 @@ from pymongo import MongoClient
 from pymongo.database import Database
 from pymongo.collection import Collection
 
-from config import MONGODB_URI, DB_NAME, PROJECTS_COLLECTION
+from config import MONGODB_URI, DB_NAME, PROJECTS_COLLECTION, STATS_COLLECTION
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +47,11 @@ class DatabaseConnection:
         """Return projects collection"""
         return self._db[PROJECTS_COLLECTION]
 
+    @property
+    def stats_collection(self) -> Collection:
+        """Return pre-aggregated stats collection"""
+        return self._db[STATS_COLLECTION]
+
     def close(self):
         """ Close database connection """
         if self._client:
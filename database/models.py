@@ -1,36 +1,178 @@
 import uuid
+import time
 import logging
 import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 
+import bson
+from pymongo import ReturnDocument
+
+from config import SEARCH_RESULT_LIMIT
 from database.connection import db_connection
+from database.search import project_search
+from database.stats import StatsModel
 
 logger = logging.getLogger(__name__)
 
 
+def _to_utc_datetime(timestamp: float) -> datetime.datetime:
+    """ Convert an epoch timestamp to the naive UTC datetime stored in MongoDB """
+    return datetime.datetime.utcfromtimestamp(timestamp)
+
+
+def _to_timestamp(value: Union[datetime.datetime, float, int]) -> float:
+    """ Convert a naive UTC datetime read from MongoDB back to an epoch timestamp """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+class FileMetadata:
+    """ Metadata of an uploaded file kept in memory while a submission is in progress """
+
+    __slots__ = (
+        'file_id', 'name', 'mime_type', 'size', 'type',
+        'uploaded_by', 'local_path', 'download_success',
+    )
+
+    def __init__(self, file_id: str, name: str, mime_type: str, size: int, type: str,
+                 uploaded_by: Optional[int] = None, local_path: Optional[str] = None,
+                 download_success: bool = False):
+        self.file_id = file_id
+        self.name = name
+        self.mime_type = mime_type
+        self.size = size
+        self.type = type
+        self.uploaded_by = uploaded_by
+        self.local_path = local_path
+        self.download_success = download_success
+
+    def to_document(self) -> Dict[str, Any]:
+        """ Convert to the document stored in the project's files list """
+        document = {
+            'file_id': self.file_id,
+            'name': self.name,
+            'mime_type': self.mime_type,
+            'size': self.size,
+            'type': self.type,
+            'uploaded_by': self.uploaded_by,
+            'download_success': self.download_success
+        }
+        if self.local_path is not None:
+            document['local_path'] = self.local_path
+        return document
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> 'FileMetadata':
+        """ Build file metadata from a stored document """
+        return cls(
+            file_id=document['file_id'],
+            name=document['name'],
+            mime_type=document.get('mime_type', 'application/octet-stream'),
+            size=document.get('size', 0),
+            type=document.get('type', 'document'),
+            uploaded_by=document.get('uploaded_by'),
+            local_path=document.get('local_path'),
+            download_success=document.get('download_success', False)
+        )
+
+    def __repr__(self) -> str:
+        return f"FileMetadata(name={self.name!r}, type={self.type!r}, size={self.size})"
+
+
+class Project:
+    """ In-flight project submission kept in the session store until it is saved """
+
+    __slots__ = (
+        'project_id', 'user_id', 'username', 'name', 'summary',
+        'files', 'contact', 'status', 'created_at',
+    )
+
+    def __init__(self, project_id: str, user_id: int, username: Optional[str] = None,
+                 name: Optional[str] = None, summary: Optional[str] = None,
+                 files: Optional[List[FileMetadata]] = None, contact: Optional[Dict[str, Any]] = None,
+                 status: str = 'new', created_at: Optional[float] = None):
+        self.project_id = project_id
+        self.user_id = user_id
+        self.username = username
+        self.name = name
+        self.summary = summary
+        self.files = files if files is not None else []
+        self.contact = contact
+        self.status = status
+        self.created_at = created_at if created_at is not None else time.time()  # epoch seconds, UTC
+
+    def to_document(self) -> Dict[str, Any]:
+        """ Convert to the document stored in the projects collection """
+        document = {
+            'project_id': self.project_id,
+            'user_id': self.user_id,
+            'username': self.username,
+            'files': [file.to_document() for file in self.files],
+            'status': self.status,
+            'created_at': _to_utc_datetime(self.created_at)
+        }
+        if self.name is not None:
+            document['name'] = self.name
+        if self.summary is not None:
+            document['summary'] = self.summary
+        if self.contact is not None:
+            document['contact'] = self.contact
+        return document
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> 'Project':
+        """ Build a project from a stored document """
+        return cls(
+            project_id=document['project_id'],
+            user_id=document['user_id'],
+            username=document.get('username'),
+            name=document.get('name'),
+            summary=document.get('summary'),
+            files=[FileMetadata.from_document(file) for file in document.get('files', [])],
+            contact=document.get('contact'),
+            status=document.get('status', 'new'),
+            created_at=_to_timestamp(document['created_at']) if 'created_at' in document else None
+        )
+
+    def to_bson(self) -> bytes:
+        """ Encode the project as BSON """
+        return bson.encode(self.to_document())
+
+    @classmethod
+    def from_bson(cls, data: bytes) -> 'Project':
+        """ Decode a project from BSON """
+        return cls.from_document(bson.decode(data))
+
+    def __repr__(self) -> str:
+        return f"Project(project_id={self.project_id!r}, user_id={self.user_id}, files={len(self.files)})"
+
+
 class ProjectModel:
     """ Project data model and operations """
 
     @staticmethod
-    def create_project(user_id: int, username: Optional[str] = None) -> Dict[str, Any]:
+    def create_project(user_id: int, username: Optional[str] = None) -> Project:
         """ Create a new project entry """
-        project = {
-            'project_id': str(uuid.uuid4()),
-            'user_id': user_id,
-            'username': username,
-            'files': [],
-            'status': 'new',
-            'created_at': datetime.datetime.utcnow()
-        }
-
-        return project
+        return Project(
+            project_id=str(uuid.uuid4()),
+            user_id=user_id,
+            username=username
+        )
 
     @staticmethod
-    def save_project(project_data: Dict[str, Any]) -> str:
+    def save_project(project_data: Union[Project, Dict[str, Any]]) -> str:
         """ Save project to database """
         try:
+            if isinstance(project_data, Project):
+                project_data = project_data.to_document()
+            project_data['stats_counted'] = False  # set once StatsModel has counted it
             result = db_connection.projects_collection.insert_one(project_data)
             logger.info(f"Project saved with ID: {result.inserted_id}")
+            project_search.add(project_data)
+            StatsModel.record_project(project_data)
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Error saving project: {e}")
@@ -50,11 +192,27 @@ class ProjectModel:
     def update_project_status(project_id: str, status: str) -> bool:
         """ Update project status """
         try:
-            result = db_connection.projects_collection.update_one(
+            # read the previous status atomically so the status counters move exactly once
+            previous = db_connection.projects_collection.find_one_and_update(
                 {'project_id': project_id},
-                {'$set': {'status': status, 'updated_at': datetime.datetime.utcnow()}}
+                {'$set': {'status': status, 'updated_at': datetime.datetime.utcnow()}},
+                projection={'_id': 0, 'status': 1},
+                return_document=ReturnDocument.BEFORE
             )
-            return result.modified_count > 0
+            if previous is None:
+                return False
+            project_search.update_status(project_id, status)
+            StatsModel.record_status_change(previous.get('status'), status)
+            return True
         except Exception as e:
             logger.error(f"Error updating project {project_id}: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    @staticmethod
+    def search_projects(query: str, limit: int = SEARCH_RESULT_LIMIT) -> List[Dict[str, Any]]:
+        """ Search projects by name, summary and file names """
+        try:
+            return project_search.search(query, limit)
+        except Exception as e:
+            logger.error(f"Error searching projects for {query!r}: {e}")
+            return []
@@ -0,0 +1,224 @@
+import re
+import time
+import heapq
+import logging
+import datetime
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import TEXT
+from pymongo.errors import OperationFailure
+
+from config import SEARCH_BACKEND, SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL
+from database.connection import db_connection
+
+logger = logging.getLogger(__name__)
+
+TEXT_INDEX_NAME = 'project_text'
+FIELD_WEIGHTS = {'name': 3, 'summary': 1, 'files.name': 1}  # shared by the Mongo index and the fallback
+
+# fields returned with every search result
+RESULT_PROJECTION = {'_id': 0, 'project_id': 1, 'name': 1, 'summary': 1, 'status': 1, 'created_at': 1}
+
+# look back this far when syncing the fallback index, covers clock skew between workers
+SYNC_MARGIN = datetime.timedelta(seconds=5)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """ Split text into lowercase word tokens """
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _field_texts(document: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """ Return (field, text) pairs of the searchable fields of a project document """
+    texts = [('name', document.get('name')), ('summary', document.get('summary'))]
+    texts.extend(('files.name', file.get('name')) for file in document.get('files', []))
+    return texts
+
+
+class InvertedIndex:
+    """ In-process text index over project name, summary and file names """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)  # token -> {project_id: weight}
+        self._documents: Dict[str, Dict[str, Any]] = {}  # project_id -> result fields
+
+    def add(self, document: Dict[str, Any]) -> None:
+        """ Index a project document """
+        project_id = document['project_id']
+        if project_id in self._documents:
+            return
+
+        self._documents[project_id] = {key: document.get(key) for key in RESULT_PROJECTION if key != '_id'}
+        for field, text in _field_texts(document):
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                postings = self._postings[token]
+                postings[project_id] = postings.get(project_id, 0) + weight
+
+    def update_status(self, project_id: str, status: str) -> None:
+        """ Update the status returned for an indexed project """
+        if project_id in self._documents:
+            self._documents[project_id]['status'] = status
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """ Return the best matching projects, any query term may match """
+        scores: Dict[str, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            for project_id, weight in self._postings.get(token, {}).items():
+                scores[project_id] += weight
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [dict(self._documents[project_id], score=score) for project_id, score in best]
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+class ProjectSearch:
+    """
+    Full-text search over projects.
+
+    Uses a MongoDB text index. If the first $text query fails (the server or
+    a local stand-in does not support it) or the backend is set to 'memory',
+    falls back to an in-process inverted index
+    built from the collection in one streaming pass and kept up to date by
+    saves in this process. Results are cached per query; the cache is
+    cleared on saves and status changes made in this process, and entries
+    expire after `cache_ttl` seconds to pick up changes made by other workers.
+    For the same reason the fallback index is topped up from the collection
+    with projects inserted or updated since its last sync once it is older
+    than `cache_ttl`.
+    """
+
+    def __init__(self, backend: str = SEARCH_BACKEND, cache_size: int = SEARCH_CACHE_SIZE,
+                 cache_ttl: float = SEARCH_CACHE_TTL, index: Optional[InvertedIndex] = None):
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._use_fallback = backend == 'memory'
+        self._text_index_ready = False
+        self._text_search_works = False  # set once a $text query succeeded
+        self._fallback = index  # built from the collection on first use if not given
+        self._synced_at = time.monotonic()  # when the fallback index was last synced
+        self._sync_since: Optional[datetime.datetime] = None  # UTC start of the last sync, None if never synced
+        self._cache: 'OrderedDict[Tuple[str, int], Tuple[float, List[Dict[str, Any]]]]' = OrderedDict()
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """ Return projects matching the query, best matches first """
+        key = (' '.join(sorted(set(tokenize(query)))), limit)
+        if not key[0]:
+            return []
+
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.cache_ttl:
+            self._cache.move_to_end(key)
+            return cached[1]
+
+        results = self._search_fallback(key[0], limit) if self._use_fallback else self._search_mongo(key[0], limit)
+
+        self._cache[key] = (time.monotonic(), results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+    def add(self, document: Dict[str, Any]) -> None:
+        """ Record a newly saved project """
+        self.invalidate()
+        if self._fallback is not None:
+            self._fallback.add(document)
+
+    def update_status(self, project_id: str, status: str) -> None:
+        """ Record a project status change """
+        self.invalidate()
+        if self._fallback is not None:
+            self._fallback.update_status(project_id, status)
+
+    def invalidate(self) -> None:
+        """ Drop all cached results """
+        self._cache.clear()
+
+    def ensure_text_index(self) -> None:
+        """ Create the MongoDB text index if it does not exist yet """
+        db_connection.projects_collection.create_index(
+            [(field, TEXT) for field in FIELD_WEIGHTS],
+            weights=FIELD_WEIGHTS,
+            name=TEXT_INDEX_NAME
+        )
+        self._text_index_ready = True
+
+    def _search_mongo(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        try:
+            if not self._text_index_ready:
+                self.ensure_text_index()
+            cursor = db_connection.projects_collection.find(
+                {'$text': {'$search': query}},
+                dict(RESULT_PROJECTION, score={'$meta': 'textScore'})
+            ).sort([('score', {'$meta': 'textScore'})]).limit(limit)
+            results = list(cursor)
+            self._text_search_works = True
+            return results
+        except Exception as e:
+            # local stand-ins fail in various ways (mongomock raises TypeError on the textScore sort),
+            # so any failure before text search has worked once means it is unsupported
+            if self._text_search_works and not isinstance(e, (OperationFailure, NotImplementedError)):
+                raise
+            logger.warning(f"Text search unavailable, using in-process index: {e}")
+            self._use_fallback = True
+            return self._search_fallback(query, limit)
+
+    def _search_fallback(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        if self._fallback is None:
+            self._fallback = self._build_fallback()
+        elif self._sync_since is not None and time.monotonic() - self._synced_at >= self.cache_ttl:
+            self._sync_fallback()
+        return self._fallback.search(query, limit)
+
+    def _build_fallback(self) -> InvertedIndex:
+        """ Index all stored projects in one streaming pass """
+        try:
+            db_connection.projects_collection.create_index('updated_at')  # used by _sync_fallback
+        except Exception as e:
+            logger.warning(f"Could not create updated_at index: {e}")
+
+        started = datetime.datetime.utcnow()
+        index = InvertedIndex()
+        projection = dict(RESULT_PROJECTION, **{'files.name': 1})
+        for document in db_connection.projects_collection.find({}, projection):
+            index.add(document)
+
+        self._sync_since = started
+        self._synced_at = time.monotonic()
+        logger.info(f"Built in-process search index over {len(index)} projects")
+        return index
+
+    def _sync_fallback(self) -> None:
+        """ Add projects saved and apply status changes made since the last sync, e.g. by other workers """
+        started = datetime.datetime.utcnow()
+        since = self._sync_since - SYNC_MARGIN
+        projection = dict(RESULT_PROJECTION, **{'files.name': 1})
+        try:
+            cursor = db_connection.projects_collection.find({'$or': [
+                {'_id': {'$gte': ObjectId.from_datetime(since)}},  # inserted since
+                {'updated_at': {'$gte': since}}
+            ]}, projection)
+            synced = 0
+            for document in cursor:
+                self._fallback.add(document)  # no-op for indexed projects
+                if document.get('status') is not None:
+                    self._fallback.update_status(document['project_id'], document['status'])
+                synced += 1
+        except Exception as e:
+            logger.error(f"Error syncing in-process search index: {e}")
+            return
+
+        self._sync_since = started
+        self._synced_at = time.monotonic()
+        if synced:
+            logger.debug(f"Synced {synced} projects into the in-process search index")
+
+
+project_search = ProjectSearch()  # global instance for easy importing
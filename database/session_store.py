@@ -0,0 +1,240 @@
+import os
+import time
+import heapq
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import SESSION_IDLE_TIMEOUT, SESSION_MAX_BYTES, SESSION_SPILL_FOLDER
+from database.models import Project
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    In-flight project submissions keyed by user ID.
+
+    Idle sessions expire after `idle_timeout` seconds. Deadlines live in a single
+    min-heap (stale entries are skipped lazily) so there is no per-user job.
+    Resident sessions are kept in LRU order; once their total size exceeds
+    `max_bytes` the least recently used ones are spilled to disk as BSON and
+    loaded back on the next access. Sizes are measured as encoded BSON bytes.
+
+    `open` picks up sessions a previous process left in the spill folder with
+    a fresh deadline, so they are evicted (and their uploads deleted) like
+    any other idle session.
+    """
+
+    def __init__(self, idle_timeout: float = SESSION_IDLE_TIMEOUT, max_bytes: int = SESSION_MAX_BYTES,
+                 spill_folder: str = SESSION_SPILL_FOLDER):
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self.spill_folder = spill_folder
+
+        self._resident: 'OrderedDict[int, Tuple[Project, int]]' = OrderedDict()  # user_id -> (project, size)
+        self._spilled: Dict[int, int] = {}  # user_id -> size on disk
+        self._deadlines: Dict[int, float] = {}  # user_id -> current expiry time
+        self._heap: List[Tuple[float, int]] = []  # (expiry time, user_id), may hold stale entries
+        self._resident_bytes = 0
+        self._spilled_bytes = 0
+
+    def use_spill_folder(self, spill_folder: str) -> None:
+        """ Switch to a different spill folder, e.g. one per worker process; call before `open` """
+        self.spill_folder = spill_folder
+
+    def open(self) -> int:
+        """ Adopt sessions spilled by a previous process and return how many there were """
+        os.makedirs(self.spill_folder, exist_ok=True)
+        restored = 0
+        for entry in os.listdir(self.spill_folder):
+            name, ext = os.path.splitext(entry)
+            if ext != '.bson' or not name.lstrip('-').isdigit():
+                continue
+            user_id = int(name)
+            if user_id in self._deadlines:
+                continue
+            size = os.path.getsize(os.path.join(self.spill_folder, entry))
+            self._spilled[user_id] = size
+            self._spilled_bytes += size
+            self._schedule(user_id)
+            restored += 1
+
+        if restored:
+            logger.info(f"Restored {restored} spilled sessions from {self.spill_folder}")
+        return restored
+
+    def put(self, user_id: int, project: Project) -> Optional[Project]:
+        """ Start (or replace) the session of a user and return the replaced one, expired or not """
+        previous = self._take(user_id)
+        self._resident[user_id] = (project, 0)
+        self.touch(user_id)
+        return previous
+
+    def get(self, user_id: int) -> Optional[Project]:
+        """ Return the session of a user and refresh its idle deadline """
+        if self._is_expired(user_id):
+            return None
+
+        if user_id in self._spilled:
+            project = self._load_spilled(user_id)
+        elif user_id in self._resident:
+            project = self._resident[user_id][0]
+            self._resident.move_to_end(user_id)
+        else:
+            return None
+
+        self._schedule(user_id)
+        return project
+
+    def touch(self, user_id: int) -> None:
+        """ Record that a session was modified: re-measure it and enforce the memory cap """
+        if user_id not in self._resident:
+            return
+
+        project, old_size = self._resident[user_id]
+        size = len(project.to_bson())
+        self._resident[user_id] = (project, size)
+        self._resident.move_to_end(user_id)
+        self._resident_bytes += size - old_size
+
+        self._schedule(user_id)
+        self._enforce_limit()
+
+    def pop(self, user_id: int) -> Optional[Project]:
+        """ Remove and return the session of a user, expired or not """
+        return self._take(user_id)
+
+    def evict_expired(self, now: Optional[float] = None) -> List[Project]:
+        """ Remove all sessions whose idle deadline has passed and return them """
+        now = time.monotonic() if now is None else now
+        expired = []
+
+        while self._heap and self._heap[0][0] <= now:
+            deadline, user_id = heapq.heappop(self._heap)
+            if self._deadlines.get(user_id) != deadline:
+                continue  # stale entry, the session was refreshed or removed
+
+            try:
+                expired.append(self._take(user_id))
+            except Exception as e:
+                # unreadable spill file: forget the session so the sweep can go on
+                logger.error(f"Error reading expired session of user {user_id}, dropping it: {e}")
+                self._discard(user_id)
+
+        if expired:
+            logger.info(f"Evicted {len(expired)} idle sessions")
+        return expired
+
+    def spill_all(self) -> int:
+        """ Write every resident session to disk before the process stops, `open` adopts them again """
+        spilled = sum(self._spill(user_id) for user_id in list(self._resident))
+        if spilled:
+            logger.info(f"Spilled {spilled} sessions to {self.spill_folder}")
+        return spilled
+
+    def stats(self) -> Dict[str, Any]:
+        """ Return resident and spilled session counts and sizes """
+        return {
+            'resident_sessions': len(self._resident),
+            'resident_bytes': self._resident_bytes,
+            'spilled_sessions': len(self._spilled),
+            'spilled_bytes': self._spilled_bytes
+        }
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._deadlines and not self._is_expired(user_id)
+
+    def _is_expired(self, user_id: int) -> bool:
+        deadline = self._deadlines.get(user_id)
+        return deadline is not None and deadline <= time.monotonic()
+
+    def _schedule(self, user_id: int) -> None:
+        """ Push a new idle deadline for a session """
+        deadline = time.monotonic() + self.idle_timeout
+        self._deadlines[user_id] = deadline
+        heapq.heappush(self._heap, (deadline, user_id))
+
+        # drop stale entries once they dominate the heap
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(d, u) for d, u in self._heap if self._deadlines.get(u) == d]
+            heapq.heapify(self._heap)
+
+    def _take(self, user_id: int) -> Optional[Project]:
+        """ Remove a session whatever its deadline and return it """
+        if user_id in self._spilled:
+            project = self._read_spilled(user_id)
+        elif user_id in self._resident:
+            project = self._resident[user_id][0]
+        else:
+            project = None
+        self._discard(user_id)
+        return project
+
+    def _discard(self, user_id: int) -> None:
+        """ Forget a session without returning it """
+        self._deadlines.pop(user_id, None)
+        if user_id in self._resident:
+            self._resident_bytes -= self._resident.pop(user_id)[1]
+        if user_id in self._spilled:
+            self._spilled_bytes -= self._spilled.pop(user_id)
+            self._remove_spill_file(user_id)
+
+    def _enforce_limit(self) -> None:
+        """ Spill least recently used sessions until the resident size fits the cap """
+        # always keep the most recently used session resident
+        while self._resident_bytes > self.max_bytes and len(self._resident) > 1:
+            if not self._spill(next(iter(self._resident))):
+                return
+
+    def _spill(self, user_id: int) -> bool:
+        """ Move a resident session to disk """
+        project, size = self._resident[user_id]
+        try:
+            os.makedirs(self.spill_folder, exist_ok=True)
+            with open(self._spill_path(user_id), 'wb') as f:
+                f.write(project.to_bson())
+        except Exception as e:
+            logger.error(f"Error spilling session of user {user_id}: {e}")
+            return False
+
+        del self._resident[user_id]
+        self._resident_bytes -= size
+        self._spilled[user_id] = size
+        self._spilled_bytes += size
+        return True
+
+    def _read_spilled(self, user_id: int) -> Project:
+        """ Decode a spilled session from disk """
+        with open(self._spill_path(user_id), 'rb') as f:
+            return Project.from_bson(f.read())
+
+    def _load_spilled(self, user_id: int) -> Project:
+        """ Load a spilled session back into memory """
+        project = self._read_spilled(user_id)
+
+        size = self._spilled.pop(user_id)
+        self._spilled_bytes -= size
+        self._remove_spill_file(user_id)
+
+        self._resident[user_id] = (project, size)
+        self._resident_bytes += size
+        self._enforce_limit()
+        return project
+
+    def _spill_path(self, user_id: int) -> str:
+        return os.path.join(self.spill_folder, f"{user_id}.bson")
+
+    def _remove_spill_file(self, user_id: int) -> None:
+        try:
+            os.remove(self._spill_path(user_id))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error removing spilled session of user {user_id}: {e}")
+
+
+session_store = SessionStore()  # global instance for easy importing
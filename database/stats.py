@@ -0,0 +1,226 @@
+import logging
+import datetime
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from database.connection import db_connection
+
+logger = logging.getLogger(__name__)
+
+# metrics kept in the stats collection, one document per (metric, key) with a running count
+TOTAL, DAY, STATUS, FILE_TYPE = 'total', 'day', 'status', 'file_type'
+
+# projects still flagged uncounted after this long were left behind by a crash or a failed update
+PENDING_GRACE = datetime.timedelta(seconds=60)
+
+
+def _counter_id(metric: str, key: str) -> str:
+    return f"{metric}:{key}"
+
+
+def _project_counters(document: Dict[str, Any]) -> Counter:
+    """ Return the counters a stored project contributes to """
+    counters = Counter()
+    counters[(TOTAL, 'projects')] += 1
+
+    created_at = document.get('created_at')
+    if isinstance(created_at, datetime.datetime):
+        counters[(DAY, created_at.strftime('%Y-%m-%d'))] += 1
+
+    counters[(STATUS, document.get('status') or 'unknown')] += 1
+
+    for file in document.get('files', []):
+        counters[(TOTAL, 'files')] += 1
+        counters[(FILE_TYPE, file.get('mime_type') or 'unknown')] += 1
+
+    return counters
+
+
+def _increments(counters: Iterable[Tuple[Tuple[str, str], int]]) -> List[UpdateOne]:
+    """ Build $inc upserts for counter deltas """
+    return [
+        UpdateOne(
+            {'_id': _counter_id(metric, key)},
+            {'$inc': {'count': delta}, '$setOnInsert': {'metric': metric, 'key': key}},
+            upsert=True
+        )
+        for (metric, key), delta in counters
+        if delta
+    ]
+
+
+class StatsModel:
+    """
+    Pre-aggregated submission stats.
+
+    Counters are updated with $inc upserts as projects are saved and change
+    status, so they live in MongoDB and survive restarts; reading them does
+    not depend on the number of projects. Projects are saved with
+    `stats_counted: False` and flagged once their increments are written, so
+    `count_pending` can finish the ones a crash or error left behind.
+    `rebuild` recomputes the counters from the projects collection to detect
+    and repair drift.
+    """
+
+    @staticmethod
+    def ensure_indexes() -> None:
+        """ Create the indexes used by get_stats and count_pending if they do not exist yet """
+        try:
+            db_connection.stats_collection.create_index('metric')
+            db_connection.projects_collection.create_index(
+                'stats_counted', partialFilterExpression={'stats_counted': False}
+            )
+        except Exception as e:
+            logger.error(f"Error creating stats indexes: {e}")
+
+    @staticmethod
+    def record_project(document: Dict[str, Any]) -> None:
+        """ Count a newly saved project and flag it as counted """
+        try:
+            db_connection.stats_collection.bulk_write(
+                _increments(_project_counters(document).items()), ordered=False
+            )
+            db_connection.projects_collection.update_one(
+                {'_id': document['_id'], 'stats_counted': False},
+                {'$set': {'stats_counted': True}}
+            )
+        except Exception as e:
+            logger.error(f"Error updating stats for project {document.get('project_id')}: {e}")
+
+    @staticmethod
+    def count_pending(grace: datetime.timedelta = PENDING_GRACE) -> int:
+        """
+        Count projects saved at least `grace` ago that are still flagged uncounted.
+
+        Each project is claimed by flipping its flag before incrementing, so
+        several workers can run this at start-up without counting twice.
+        """
+        counted = 0
+        try:
+            projects = db_connection.projects_collection
+            cutoff = ObjectId.from_datetime(datetime.datetime.utcnow() - grace)
+            projection = {'status': 1, 'created_at': 1, 'files.mime_type': 1}
+            for document in projects.find({'stats_counted': False, '_id': {'$lt': cutoff}}, projection):
+                claimed = projects.update_one(
+                    {'_id': document['_id'], 'stats_counted': False},
+                    {'$set': {'stats_counted': True}}
+                )
+                if not claimed.modified_count:
+                    continue  # counted by someone else meanwhile
+                try:
+                    db_connection.stats_collection.bulk_write(
+                        _increments(_project_counters(document).items()), ordered=False
+                    )
+                except Exception:
+                    projects.update_one({'_id': document['_id']}, {'$set': {'stats_counted': False}})
+                    raise
+                counted += 1
+        except Exception as e:
+            logger.error(f"Error counting pending projects: {e}")
+
+        if counted:
+            logger.info(f"Counted {counted} projects missing from stats")
+        return counted
+
+    @staticmethod
+    def record_status_change(old_status: str, new_status: str) -> None:
+        """ Move a project from one status counter to another """
+        if old_status == new_status:
+            return
+        try:
+            db_connection.stats_collection.bulk_write(
+                _increments([((STATUS, old_status or 'unknown'), -1), ((STATUS, new_status), 1)]), ordered=False
+            )
+        except Exception as e:
+            logger.error(f"Error updating status stats ({old_status} -> {new_status}): {e}")
+
+    @staticmethod
+    def get_stats(days: int = 7) -> Dict[str, Any]:
+        """ Return totals, counts per status and file type, and per day for the last `days` days """
+        today = datetime.datetime.utcnow().date()
+        day_keys = [(today - datetime.timedelta(days=offset)).isoformat() for offset in range(days)]
+
+        stats = {TOTAL: {}, STATUS: {}, FILE_TYPE: {}, DAY: {key: 0 for key in day_keys}}
+        try:
+            cursor = db_connection.stats_collection.find({'$or': [
+                {'metric': {'$in': [TOTAL, STATUS, FILE_TYPE]}},
+                {'_id': {'$in': [_counter_id(DAY, key) for key in day_keys]}}
+            ]})
+            for counter in cursor:
+                if counter['count']:
+                    stats[counter['metric']][counter['key']] = counter['count']
+        except Exception as e:
+            logger.error(f"Error reading stats: {e}")
+        return stats
+
+    @staticmethod
+    def rebuild(apply: bool = False, batch_size: int = 1000) -> Dict[str, Tuple[int, int]]:
+        """
+        Recompute all counters from the projects collection in one streaming pass.
+
+        Returns the drift as {counter_id: (stored, actual)}. With `apply` each
+        drifted counter is corrected by $inc of (actual - stored).
+
+        The pass is bounded so that the bot can keep running: the stored
+        counters are read first and only projects inserted before that are
+        counted, so later saves are neither counted twice nor subtracted.
+        Saves still in flight (saved within the last minute and not yet
+        flagged as counted) are left to their own increments. If a project's
+        status changed during the pass its status at the time of the read is
+        unknown, so status counters are then left alone; run it again later.
+        Applying also flags older pending projects as counted, since the
+        rebuild includes them.
+        """
+        started = datetime.datetime.utcnow()
+        start_id = ObjectId.from_datetime(started)
+        pending_cutoff = ObjectId.from_datetime(started - PENDING_GRACE)
+
+        if apply:
+            db_connection.projects_collection.update_many(
+                {'stats_counted': False, '_id': {'$lt': pending_cutoff}},
+                {'$set': {'stats_counted': True}}
+            )
+
+        stored = Counter({
+            (counter['metric'], counter['key']): counter['count']
+            for counter in db_connection.stats_collection.find({}, {'metric': 1, 'key': 1, 'count': 1})
+        })
+
+        actual = Counter()
+        status_changed = 0
+        projection = {'status': 1, 'created_at': 1, 'files.mime_type': 1, 'stats_counted': 1, 'updated_at': 1}
+        cursor = db_connection.projects_collection.find({'_id': {'$lt': start_id}}, projection, batch_size=batch_size)
+        for document in cursor:
+            if document.get('stats_counted') is False and document['_id'] >= pending_cutoff:
+                continue  # being saved right now, its own increments will count it
+            updated_at = document.get('updated_at')
+            if updated_at is not None and updated_at >= started:
+                status_changed += 1
+            actual.update(_project_counters(document))
+
+        counters = set(actual) | set(stored)
+        if status_changed:
+            logger.warning(f"{status_changed} projects changed status during the rebuild, "
+                           f"status counters were not checked; run it again")
+            counters = {counter for counter in counters if counter[0] != STATUS}
+
+        deltas = {
+            counter: actual[counter] - stored[counter]
+            for counter in counters
+            if actual[counter] != stored[counter]
+        }
+        drift = {
+            _counter_id(metric, key): (stored[(metric, key)], actual[(metric, key)])
+            for metric, key in deltas
+        }
+
+        logger.info(f"Stats rebuild found {len(drift)} drifted counters")
+
+        if apply and deltas:
+            db_connection.stats_collection.bulk_write(_increments(deltas.items()), ordered=False)
+            logger.info(f"Stats rebuild corrected {len(deltas)} counters")
+
+        return drift
@@ -1,5 +1,6 @@
 from handlers import start_handler
 from handlers import project_handlers
 from handlers import file_handlers
+from handlers import admin_handlers
 
-__all__ = ['start_handler', 'project_handlers', 'file_handlers']
\ No newline at end of file
+__all__ = ['start_handler', 'project_handlers', 'file_handlers', 'admin_handlers']
\ No newline at end of file
@@ -0,0 +1,113 @@
+import logging
+from typing import List
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes
+
+from config import ADMIN_USER_IDS
+from database.models import ProjectModel
+from database.stats import StatsModel
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit for one message
+SUMMARY_PREVIEW_LENGTH = 200
+
+
+def is_admin(user_id: int) -> bool:
+    """ Check whether a user may run admin commands """
+    return user_id in ADMIN_USER_IDS
+
+
+def shorten(text: str, length: int) -> str:
+    """ Cut text to at most `length` characters """
+    return text if len(text) <= length else text[:length - 1].rstrip() + '…'
+
+
+def split_message(lines: List[str], limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """ Join lines into as few messages under the limit as possible """
+    messages, current = [], ''
+    for line in lines:
+        line = shorten(line, limit)
+        if current and len(current) + 1 + len(line) > limit:
+            messages.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
+
+
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """ Search submitted projects by keyword when the command /search is issued """
+    user_id = update.effective_user.id
+    if not is_admin(user_id):
+        logger.warning(f"User {user_id} tried to use /search without admin rights")
+        await update.message.reply_text("This command is only available to staff.")
+        return
+
+    query = ' '.join(context.args)
+    if not query:
+        await update.message.reply_text(
+            "Please provide keywords after the /search command.\n"
+            "For example: /search marketing website"
+        )
+        return
+
+    logger.info(f"Admin {user_id} searched projects for {query!r}")
+    results = ProjectModel.search_projects(query)
+
+    if not results:
+        await update.message.reply_text(f"No projects found for \"{query}\".")
+        return
+
+    lines = [f"Found {len(results)} project(s) for \"{query}\":\n"]
+    for project in results:
+        created_at = project.get('created_at')
+        created = created_at.strftime('%Y-%m-%d') if created_at else 'unknown date'
+        lines.append(
+            f"• {project.get('name') or 'Untitled'} ({project.get('status') or 'new'}, {created})\n"
+            f"  {shorten(project.get('summary') or '', SUMMARY_PREVIEW_LENGTH)}\n"
+            f"  ID: {project['project_id']}"
+        )
+
+    # long names or many results can go over the message size limit
+    for message in split_message(lines):
+        await update.message.reply_text(message)
+
+
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """ Show submission stats when the command /stats is issued """
+    user_id = update.effective_user.id
+    if not is_admin(user_id):
+        logger.warning(f"User {user_id} tried to use /stats without admin rights")
+        await update.message.reply_text("This command is only available to staff.")
+        return
+
+    logger.info(f"Admin {user_id} requested stats")
+    stats = StatsModel.get_stats()
+
+    lines = [
+        "📊 Submission stats\n",
+        f"Projects: {stats['total'].get('projects', 0)}",
+        f"Files: {stats['total'].get('files', 0)}\n",
+        "By status:"
+    ]
+    lines.extend(f"  {status}: {count}" for status, count in sorted(stats['status'].items()))
+    lines.append("\nBy file type:")
+    lines.extend(
+        f"  {file_type}: {count}"
+        for file_type, count in sorted(stats['file_type'].items(), key=lambda item: -item[1])
+    )
+    lines.append("\nLast 7 days:")
+    lines.extend(f"  {day}: {count}" for day, count in stats['day'].items())
+
+    await update.message.reply_text('\n'.join(lines))
+
+
+def register_admin_handlers(application: Application) -> None:
+    """ Register staff-only command handlers """
+    application.add_handler(CommandHandler('search', search_command))
+    application.add_handler(CommandHandler('stats', stats_command))
+
+    logger.info("Admin handlers registered")
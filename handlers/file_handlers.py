@@ -1,9 +1,13 @@
 import os
 import logging
-from typing import Dict, Any, Optional, BinaryIO
+from datetime import datetime
+from typing import Dict, Any, Optional, Union, BinaryIO
 from telegram import Update, File
 from telegram.ext import ContextTypes
 
+from database.models import Project, FileMetadata
+from database.session_store import session_store
+
 logger = logging.getLogger(__name__)
 
 # Configure file storage
@@ -28,12 +32,13 @@ async def download_file(file: File, destination: str) -> bool:
         return False
 
 
-async def process_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[Dict[str, Any]]:
+async def process_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[Union[FileMetadata, Dict[str, Any]]]:
     """ Process an uploaded file and store it """
     try:
         # get the user ID for folder organization
         user_id = update.effective_user.id
-        project_id = context.user_data.get('current_project', {}).get('project_id', 'unknown')
+        project = session_store.get(user_id)
+        project_id = project.project_id if project is not None else 'unknown'
 
         # extract file info based on file type
         if update.message.document:
@@ -62,14 +67,14 @@ async def process_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE
             }
 
         # prepare file metadata
-        file_metadata = {
-            'file_id': file.file_id,
-            'name': file_name,
-            'mime_type': mime_type,
-            'size': file_size,
-            'type': file_type,
-            'uploaded_by': user_id
-        }
+        file_metadata = FileMetadata(
+            file_id=file.file_id,
+            name=file_name,
+            mime_type=mime_type,
+            size=file_size,
+            type=file_type,
+            uploaded_by=user_id
+        )
 
         # create folder structure: uploads/user_id/project_id/
         save_dir = os.path.join(UPLOAD_FOLDER, str(user_id), project_id)
@@ -85,17 +90,18 @@ async def process_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE
             timestamp = int(datetime.now().timestamp())
             file_name = f"{base}_{timestamp}{ext}"
             local_path = os.path.join(save_dir, file_name)
+            file_metadata.name = file_name
 
         #get the file from Telegram
         telegram_file = await file.get_file()
 
         # download and save the file
         if await download_file(telegram_file, local_path):
-            file_metadata['local_path'] = local_path
-            file_metadata['download_success'] = True
+            file_metadata.local_path = local_path
+            file_metadata.download_success = True
             logger.info(f"File {file_name} successfully saved to {local_path}")
         else:
-            file_metadata['download_success'] = False
+            file_metadata.download_success = False
             logger.error(f"Failed to download file {file_name}")
 
         return file_metadata
@@ -105,7 +111,7 @@ async def process_file_upload(update: Update, context: ContextTypes.DEFAULT_TYPE
         return None
 
 
-async def validate_file(file_metadata: Dict[str, Any]) -> Dict[str, Any]:
+async def validate_file(file_metadata: FileMetadata) -> Dict[str, Any]:
     """ Validate file for security and appropriateness """
 
     # Initialize validation result
@@ -115,14 +121,14 @@ async def validate_file(file_metadata: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     # check if file was downloaded successfully
-    if not file_metadata.get('download_success', False):
+    if not file_metadata.download_success:
         validation['valid'] = False
         validation['issues'].append('download_failed')
         return validation
 
     # check file size again (local file may differ from reported size)
     try:
-        local_path = file_metadata.get('local_path')
+        local_path = file_metadata.local_path
         if local_path and os.path.exists(local_path):
             actual_size = os.path.getsize(local_path)
             if actual_size > MAX_FILE_SIZE:
@@ -156,4 +162,21 @@ async def delete_file(file_path: str) -> bool:
             return False
     except Exception as e:
         logger.error(f"Error deleting file {file_path}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+async def cleanup_project_files(project: Project) -> int:
+    """ Delete the uploads of an abandoned project and return how many were removed """
+    deleted = 0
+    for file_metadata in project.files:
+        if file_metadata.local_path and await delete_file(file_metadata.local_path):
+            deleted += 1
+
+    # remove the project folder if nothing else is left in it
+    project_dir = os.path.join(UPLOAD_FOLDER, str(project.user_id), project.project_id)
+    try:
+        if os.path.isdir(project_dir) and not os.listdir(project_dir):
+            os.rmdir(project_dir)
+    except Exception as e:
+        logger.error(f"Error removing project folder {project_dir}: {e}")
+
+    return deleted
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -10,13 +11,26 @@ from telegram.ext import (
     CallbackQueryHandler,
     filters,
 )
+from config import SESSION_SWEEP_INTERVAL
 from database.models import ProjectModel
+from database.session_store import session_store
 from utils.helpers import extract_contact_info, extract_project_info, handle_file_upload
 
 BASIC_INFO, BRIEF_FILE, ADDITIONAL_BRIEF, CONTACT_INFO = range(4) # define conversation states
 
 logger = logging.getLogger(__name__)
 
+
+async def session_expired(update: Update) -> int:
+    """ Tell the user their submission was evicted after being idle and end the conversation """
+    text = "Your project submission expired after being idle. You can start again anytime with /newproject."
+    if update.callback_query:
+        await update.callback_query.edit_message_text(text)
+    else:
+        await update.message.reply_text(text)
+    return ConversationHandler.END
+
+
 async def new_project(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """ Start the project submission process """
 
@@ -30,11 +44,14 @@ async def new_project(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int
         "For example: /basicinfo Marketing Website - Need a new responsive website for our marketing campaign"
     )
 
-    # init a new project in user_data
-    context.user_data['current_project'] = ProjectModel.create_project(
+    # init a new project in the session store, an abandoned earlier one loses its uploads
+    previous = session_store.put(user.id, ProjectModel.create_project(
         user_id=user.id,
         username=user.username
-    )
+    ))
+    if previous is not None:
+        from handlers.file_handlers import cleanup_project_files
+        await cleanup_project_files(previous)
 
     return BASIC_INFO
 
@@ -46,6 +63,10 @@ async def basic_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     text = update.message.text
     logger.info(f"User {user_id} submitted basic project info")
 
+    project = session_store.get(user_id)
+    if project is None:
+        return await session_expired(update)
+
     if not text.startswith('/basicinfo'):
         await update.message.reply_text(
             "Please use the /basicinfo command followed by your project name and summary."
@@ -63,9 +84,10 @@ async def basic_info(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     try:
         project_name, project_summary = extract_project_info(project_info) # process the info
 
-        # save to user data
-        context.user_data['current_project']['name'] = project_name
-        context.user_data['current_project']['summary'] = project_summary
+        # save to the session
+        project.name = project_name
+        project.summary = project_summary
+        session_store.touch(user_id)
 
         await update.message.reply_text(
             f"Great! I've recorded the following information:\n\n"
@@ -88,6 +110,10 @@ async def brief_file(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle brief document upload."""
     user_id = update.effective_user.id
 
+    project = session_store.get(user_id)
+    if project is None:
+        return await session_expired(update)
+
     # Check if this is the command or a file upload
     if update.message.text and update.message.text.startswith('/brieffile'):
         logger.info(f"User {user_id} initiated file upload")
@@ -115,7 +141,7 @@ async def brief_file(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
             )
             return BRIEF_FILE
 
-        if 'error' in file_metadata:
+        if isinstance(file_metadata, dict):  # error result
             if file_metadata['error'] == 'file_too_large':
                 max_mb = file_metadata['max_size'] / (1024 * 1024)
                 await processing_message.edit_text(
@@ -137,18 +163,16 @@ async def brief_file(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
             )
             # Clean up invalid file
             from handlers.file_handlers import delete_file
-            if 'local_path' in file_metadata:
-                await delete_file(file_metadata['local_path'])
+            if file_metadata.local_path:
+                await delete_file(file_metadata.local_path)
             return BRIEF_FILE
 
         # file is valid, update processing message
-        await processing_message.edit_text(f"File '{file_metadata['name']}' received successfully!")
+        await processing_message.edit_text(f"File '{file_metadata.name}' received successfully!")
 
         # add file info to project
-        if 'files' not in context.user_data['current_project']:
-            context.user_data['current_project']['files'] = []
-
-        context.user_data['current_project']['files'].append(file_metadata)
+        project.files.append(file_metadata)
+        session_store.touch(user_id)
 
         # ask if they want to add more files
         keyboard = [
@@ -178,6 +202,9 @@ async def additional_brief_callback(update: Update, context: ContextTypes.DEFAUL
     user_id = update.effective_user.id
     await query.answer()
 
+    if session_store.get(user_id) is None:
+        return await session_expired(update)
+
     if query.data == 'more_files':
         logger.info(f"User {user_id} wants to add more files")
         await query.edit_message_text(
@@ -197,6 +224,9 @@ async def skip_additional_brief(update: Update, context: ContextTypes.DEFAULT_TY
     user_id = update.effective_user.id
     logger.info(f"User {user_id} skipped additional files")
 
+    if session_store.get(user_id) is None:
+        return await session_expired(update)
+
     await update.message.reply_text(
         "Skipping additional files. Now, let's get your contact information.\n\n"
         "Please use the /getintouch command followed by your email and phone number like this:\n"
@@ -211,6 +241,10 @@ async def get_into_touch(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     text = update.message.text
     logger.info(f"User {user_id} submitted contact info")
 
+    project = session_store.get(user_id)
+    if project is None:
+        return await session_expired(update)
+
     if not text.startswith('/getintouch'):
         await update.message.reply_text(
             "Please use the /getintouch command followed by your email and phone number."
@@ -230,19 +264,19 @@ async def get_into_touch(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         # process the contact info
         email, phone = extract_contact_info(contact_info)
 
-        # save to user data
-        context.user_data['current_project']['contact'] = {
+        # save to the session
+        project.contact = {
             'email': email,
             'phone': phone,
             'submitted_at': datetime.utcnow().isoformat()
         }
 
         # save the project to the database
-        project_id = ProjectModel.save_project(context.user_data['current_project'])
+        project_id = ProjectModel.save_project(project)
 
         await update.message.reply_text(
             f"Thank you for submitting your project information! 🎉\n\n"
-            f"Your project has been registered with ID: {context.user_data['current_project']['project_id']}\n\n"
+            f"Your project has been registered with ID: {project.project_id}\n\n"
             f"We've recorded the following contact details:\n"
             f"Email: {email}\n"
             f"Phone: {phone}\n\n"
@@ -250,7 +284,8 @@ async def get_into_touch(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             f"If you have any questions in the meantime, feel free to reach out."
         )
 
-        # Clear user data
+        # Clear session and user data
+        session_store.pop(user_id)
         context.user_data.clear()
 
         return ConversationHandler.END
@@ -271,13 +306,45 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     await update.message.reply_text(
         "Project submission canceled. You can start again anytime with /newproject."
     )
+    # remove the abandoned session together with its uploads
+    from handlers.file_handlers import cleanup_project_files
+    project = session_store.pop(user_id)
+    if project is not None:
+        await cleanup_project_files(project)
+
     context.user_data.clear()
     return ConversationHandler.END
 
 
+async def sweep_idle_sessions(interval: float = SESSION_SWEEP_INTERVAL) -> None:
+    """ Periodically evict idle sessions and delete their uploads """
+    from handlers.file_handlers import cleanup_project_files
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            expired = session_store.evict_expired()
+            for project in expired:
+                deleted = await cleanup_project_files(project)
+                logger.info(f"Evicted idle project {project.project_id} of user {project.user_id}, "
+                            f"deleted {deleted} files")
+
+            stats = session_store.stats()
+            logger.debug(
+                f"Sessions: {stats['resident_sessions']} resident ({stats['resident_bytes']} bytes), "
+                f"{stats['spilled_sessions']} spilled ({stats['spilled_bytes']} bytes)"
+            )
+        except Exception as e:
+            logger.error(f"Error sweeping idle sessions: {e}")
+
+
 def register_project_handlers(application: Application) -> None:
     """ Register project-related handlers """
     # add conversation handler
+    # no conversation_timeout: it needs the job-queue extra and schedules a job per user. Idle
+    # sessions are evicted by sweep_idle_sessions instead; the leftover conversation state is a
+    # single int per user, and the next message in it ends the conversation via session_expired or
+    # restarts it via /newproject
     conv_handler = ConversationHandler(
         entry_points=[CommandHandler('newproject', new_project)],
         states={
@@ -300,7 +367,10 @@ def register_project_handlers(application: Application) -> None:
                 MessageHandler(filters.TEXT & ~filters.COMMAND, get_into_touch)
             ],
         },
-        fallbacks=[CommandHandler('cancel', cancel)]
+        fallbacks=[CommandHandler('cancel', cancel)],
+        name='project_submission',
+        persistent=True,  # survives restarts together with the spilled sessions
+        allow_reentry=True  # /newproject restarts, e.g. after the session expired; new_project cleans up the old one
     )
     application.add_handler(conv_handler)
     logger.info("Project handlers registered")
\ No newline at end of file
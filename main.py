@@ -1,24 +1,87 @@
+import os
+import asyncio
 import logging
-from telegram.ext import Application
-from config import TELEGRAM_TOKEN
+import argparse
+from telegram.ext import Application, PicklePersistence, PersistenceInput
+from config import TELEGRAM_TOKEN, WORKER_COUNT
 from utils.logger import setup_logger
 from handlers.start_handler import register_start_handlers
-from handlers.project_handlers import register_project_handlers
+from handlers.admin_handlers import register_admin_handlers
+from handlers.project_handlers import register_project_handlers, sweep_idle_sessions
+from database.stats import StatsModel
+from database.session_store import session_store
 
 logger = setup_logger(__name__) # set up logging
 
 
-def main() -> None:
-    """Initialize and start the bot"""
+async def post_init(application: Application) -> None:
+    """Start background tasks once the application is initialized"""
+    # sessions left on disk by a previous run expire and get cleaned up by the sweeper
+    session_store.open()
 
-    logger.info("Starting bot...")
+    # not application.create_task: stop() waits for those and the sweep never ends
+    application.bot_data['session_sweeper'] = asyncio.create_task(sweep_idle_sessions())
 
-    # create the Application
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+    # finish stats increments a previous run did not get to
+    StatsModel.ensure_indexes()
+    StatsModel.count_pending()
+
+
+async def post_stop(application: Application) -> None:
+    """Cancel background tasks once the application has stopped"""
+    sweeper = application.bot_data.pop('session_sweeper', None)
+    if sweeper:
+        sweeper.cancel()
+
+    # keep submissions in progress for the next run, conversation states are kept by the persistence
+    session_store.spill_all()
+
+
+def build_application(with_updater: bool = True) -> Application:
+    """Create the Application and register all handlers"""
+    # conversation states are stored next to the spilled sessions so both survive a restart
+    os.makedirs(session_store.spill_folder, exist_ok=True)
+    persistence = PicklePersistence(
+        filepath=os.path.join(session_store.spill_folder, 'conversations.pickle'),
+        store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=False, callback_data=False)
+    )
+
+    builder = (
+        Application.builder()
+        .token(TELEGRAM_TOKEN)
+        .persistence(persistence)
+        .post_init(post_init)
+        .post_stop(post_stop)
+    )
+    if not with_updater:
+        builder = builder.updater(None)  # updates are fed by the supervisor
+    application = builder.build()
 
     # register all handlers
     register_start_handlers(application)
     register_project_handlers(application)
+    register_admin_handlers(application)
+
+    return application
+
+
+def main() -> None:
+    """Initialize and start the bot"""
+
+    parser = argparse.ArgumentParser(description="Telegram Task Wizard Bot")
+    parser.add_argument('--workers', type=int, default=WORKER_COUNT,
+                        help="number of worker processes, updates are sharded by user ID")
+    args = parser.parse_args()
+
+    logger.info("Starting bot...")
+
+    if args.workers > 1:
+        from supervisor import run_supervisor
+        run_supervisor(args.workers)
+        return
+
+    # create the Application
+    application = build_application()
 
     # start the bot
     logger.info("Bot started, polling for updates...")
@@ -26,4 +89,4 @@ def main() -> None:
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,42 @@
+"""
+Recompute the stats rollups from the projects collection.
+
+Streams every project once, compares the recomputed counters with the
+stored ones and prints the drift. Pass --apply to correct each drifted
+counter by the difference. Safe to run while the bot is running; projects
+saved during the pass are left out, see StatsModel.rebuild.
+
+    python -m scripts.rebuild_stats [--apply]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger  # noqa: E402
+from database.stats import StatsModel  # noqa: E402
+
+logger = setup_logger('rebuild_stats')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--apply', action='store_true', help="write the recomputed counters")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    drift = StatsModel.rebuild(apply=args.apply, batch_size=args.batch_size)
+
+    if not drift:
+        print("No drift, stats match the projects collection.")
+        return
+
+    print(f"{len(drift)} drifted counters (stored -> actual):")
+    for counter_id, (stored, actual) in sorted(drift.items()):
+        print(f"  {counter_id}: {stored} -> {actual}")
+    print("Counters corrected." if args.apply else "Run with --apply to correct them.")
+
+
+if __name__ == '__main__':
+    main()
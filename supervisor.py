@@ -0,0 +1,251 @@
+import os
+import signal
+import asyncio
+import logging
+import threading
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional
+
+from telegram import Bot, Update
+from telegram.error import TelegramError
+
+from config import (
+    TELEGRAM_TOKEN,
+    POLL_TIMEOUT,
+    SESSION_MAX_BYTES,
+    SESSION_SPILL_FOLDER,
+    WORKER_SHUTDOWN_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# worker entry points take their index, the queue of updates for their shard and the worker count
+WorkerTarget = Callable[[int, Any, int], None]
+
+
+def run_bot_worker(index: int, queue: Any, workers: int) -> None:
+    """ Worker process entry point: run the bot handlers for one shard of users """
+    # the supervisor stops workers through their queue; under systemd SIGINT/SIGTERM reach the whole
+    # control group and would kill workers before they drained updates the supervisor already acknowledged
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(_serve_bot_worker(index, queue, workers))
+
+
+async def _serve_bot_worker(index: int, queue: Any, workers: int) -> None:
+    """ Feed updates from the shard queue into an Application without its own updater """
+    from main import build_application
+    from utils.logger import setup_logger
+    from database.session_store import session_store
+
+    worker_logger = setup_logger(f"worker-{index}")
+    session_store.use_spill_folder(os.path.join(SESSION_SPILL_FOLDER, f"worker-{index}"))
+    session_store.max_bytes = SESSION_MAX_BYTES // workers  # the configured cap is for all workers together
+
+    application = build_application(with_updater=False)
+    loop = asyncio.get_running_loop()
+
+    async with application:
+        await application.start()
+        await application.post_init(application)
+        worker_logger.info(f"Worker {index} started (pid {os.getpid()})")
+
+        while True:
+            data = await loop.run_in_executor(None, queue.get)
+            if data is None:  # stop signal, everything queued before it has been read
+                break
+            try:
+                await application.update_queue.put(Update.de_json(data, application.bot))
+            except Exception as e:
+                worker_logger.error(f"Error decoding update: {e}")
+
+        # stop() processes the updates already handed to the application
+        await application.stop()
+        await application.post_stop(application)
+
+    worker_logger.info(f"Worker {index} stopped")
+
+
+class Supervisor:
+    """
+    Runs worker processes and routes updates to them by user ID.
+
+    Every shard has its own queue that outlives a cleanly stopped worker, so a
+    worker can be drained and replaced while updates for its users keep
+    queueing up; the replacement continues where the old one stopped and each
+    user's updates stay on one process and in order. A worker that dies
+    without a clean exit may still hold the queue's read lock, so its
+    replacement gets a new queue and the updates left in the old one are lost.
+    """
+
+    def __init__(self, workers: int, target: WorkerTarget = run_bot_worker,
+                 shutdown_timeout: float = WORKER_SHUTDOWN_TIMEOUT):
+        if workers < 1:
+            raise ValueError("At least one worker is required")
+
+        self.workers = workers
+        self.target = target
+        self.shutdown_timeout = shutdown_timeout
+
+        self._context = multiprocessing.get_context('spawn')  # MongoClient is not fork-safe
+        self._queues = [self._context.Queue() for _ in range(workers)]
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._restarting = set()
+        self._restart_lock = threading.Lock()
+
+    def start(self) -> None:
+        """ Start all worker processes """
+        for index in range(self.workers):
+            self._spawn(index)
+
+    def shard(self, user_id: int) -> int:
+        """ Return the worker index for a user """
+        return user_id % self.workers
+
+    def dispatch(self, user_id: int, data: Dict[str, Any]) -> None:
+        """ Queue an update for the worker owning the user """
+        self._queues[self.shard(user_id)].put(data)
+
+    def check_workers(self) -> None:
+        """ Respawn workers that exited unexpectedly """
+        for index, process in enumerate(self._processes):
+            if index in self._restarting or process is None or process.is_alive():
+                continue
+            logger.warning(f"Worker {index} exited with code {process.exitcode}, restarting")
+            if process.exitcode != 0:
+                self._replace_queue(index)
+            self._spawn(index)
+
+    def restart_worker(self, index: int) -> None:
+        """ Drain a worker and replace it with a fresh process on the same queue """
+        self._restarting.add(index)
+        try:
+            self._stop_worker(index)
+            process = self._processes[index]
+            if process is not None and process.exitcode != 0:  # crashed or was terminated
+                self._replace_queue(index)
+            self._spawn(index)
+        finally:
+            self._restarting.discard(index)
+
+    def rolling_restart(self) -> None:
+        """ Restart workers one at a time so the other shards keep running """
+        if not self._restart_lock.acquire(blocking=False):
+            logger.warning("Rolling restart already in progress")
+            return
+        try:
+            logger.info("Rolling restart started")
+            for index in range(self.workers):
+                self.restart_worker(index)
+            logger.info("Rolling restart finished")
+        finally:
+            self._restart_lock.release()
+
+    def stop(self) -> None:
+        """ Drain and stop all workers """
+        for index, process in enumerate(self._processes):
+            self._restarting.add(index)
+            if process is not None and process.is_alive():
+                self._queues[index].put(None)
+        for index in range(self.workers):
+            self._join(index)
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=self.target,
+            args=(index, self._queues[index], self.workers),
+            name=f"worker-{index}"
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info(f"Worker {index} spawned (pid {process.pid})")
+
+    def _replace_queue(self, index: int) -> None:
+        """ Give a shard a new queue, a worker killed inside get() leaves the old one locked for good """
+        old_queue = self._queues[index]
+        self._queues[index] = self._context.Queue()
+        try:
+            lost = old_queue.qsize()
+        except NotImplementedError:  # not available on macOS
+            lost = 'an unknown number of'
+        logger.error(f"Worker {index} did not exit cleanly, {lost} queued updates for its users were lost")
+        old_queue.cancel_join_thread()  # nobody reads it any more, don't block exit flushing it
+        old_queue.close()
+
+    def _stop_worker(self, index: int) -> None:
+        process = self._processes[index]
+        if process is not None and process.is_alive():  # a dead worker would leave the stop signal for its successor
+            self._queues[index].put(None)
+        self._join(index)
+
+    def _join(self, index: int) -> None:
+        process = self._processes[index]
+        if process is None:
+            return
+        process.join(self.shutdown_timeout)
+        if process.is_alive():
+            logger.warning(f"Worker {index} did not stop within {self.shutdown_timeout}s, killing it")
+            process.kill()  # workers ignore SIGTERM
+            process.join()
+
+
+def shard_key(update: Update) -> int:
+    """ Return the ID an update is sharded by: its user, else its chat """
+    if update.effective_user:
+        return update.effective_user.id
+    if update.effective_chat:
+        return update.effective_chat.id
+    return 0
+
+
+async def receive_updates(supervisor: Supervisor) -> None:
+    """ Long-poll Telegram and hand each update to the worker owning its user """
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+
+    loop.add_signal_handler(signal.SIGINT, stopping.set)
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+    loop.add_signal_handler(
+        signal.SIGHUP, lambda: loop.run_in_executor(None, supervisor.rolling_restart)
+    )
+
+    async with Bot(TELEGRAM_TOKEN) as bot:
+        await bot.delete_webhook()
+        offset = None
+
+        while not stopping.is_set():
+            supervisor.check_workers()
+            try:
+                updates = await bot.get_updates(
+                    offset=offset,
+                    timeout=POLL_TIMEOUT,
+                    allowed_updates=Update.ALL_TYPES
+                )
+            except TelegramError as e:
+                logger.error(f"Error fetching updates: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for update in updates:
+                supervisor.dispatch(shard_key(update), update.to_dict())
+                offset = update.update_id + 1
+
+        # acknowledge dispatched updates so they are not fetched again
+        if offset is not None:
+            try:
+                await bot.get_updates(offset=offset, timeout=0, limit=1)
+            except TelegramError as e:
+                logger.error(f"Error acknowledging updates: {e}")
+
+
+def run_supervisor(workers: int) -> None:
+    """ Run the bot as one update receiver and `workers` worker processes """
+    supervisor = Supervisor(workers)
+    supervisor.start()
+    logger.info(f"Supervisor started with {workers} workers, polling for updates...")
+    try:
+        asyncio.run(receive_updates(supervisor))
+    finally:
+        logger.info("Stopping workers...")
+        supervisor.stop()
+        logger.info("Supervisor stopped")
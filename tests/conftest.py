@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config refuses to load without a token; nothing here talks to Telegram or MongoDB
+os.environ.setdefault('TELEGRAM_TOKEN', 'test')
+os.environ.setdefault('SESSION_SPILL_FOLDER', tempfile.mkdtemp(prefix='sessions-'))
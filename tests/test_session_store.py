@@ -0,0 +1,202 @@
+import os
+
+import pytest
+
+import database.session_store as session_store_module
+from database.models import Project, FileMetadata
+from database.session_store import SessionStore
+
+IDLE_TIMEOUT = 60
+
+
+class FakeTime:
+    """ Stand-in for the time module with a manually advanced clock """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(session_store_module, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=1024 * 1024, spill_folder=str(tmp_path))
+
+
+def make_project(user_id: int, files: int = 1) -> Project:
+    project = Project(project_id=f"project-{user_id}", user_id=user_id, name='Website', summary='A new website')
+    for i in range(files):
+        project.files.append(FileMetadata(
+            file_id=f"file-{user_id}-{i}", name=f"brief_{i}.pdf", mime_type='application/pdf', size=1024,
+            type='document', uploaded_by=user_id, local_path=f"uploads/{user_id}/brief_{i}.pdf",
+            download_success=True
+        ))
+    return project
+
+
+def resident_size(*projects: Project) -> int:
+    return sum(len(project.to_bson()) for project in projects)
+
+
+def test_get_refreshes_deadline(store, clock):
+    project = make_project(1)
+    store.put(1, project)
+
+    clock.now += IDLE_TIMEOUT - 1
+    assert store.get(1) is project
+
+    clock.now += IDLE_TIMEOUT - 1
+    assert store.evict_expired() == []  # the first deadline is stale
+    assert store.get(1) is project
+
+
+def test_expired_session_is_hidden_until_swept(store, clock):
+    project = make_project(1)
+    store.put(1, project)
+
+    clock.now += IDLE_TIMEOUT
+    assert store.get(1) is None
+    assert 1 not in store
+    assert store.evict_expired() == [project]
+    assert len(store) == 0
+
+
+def test_pop_returns_expired_session(store, clock):
+    project = make_project(1)
+    store.put(1, project)
+
+    clock.now += IDLE_TIMEOUT
+    assert store.pop(1) is project
+    assert store.evict_expired() == []
+    assert store.stats()['resident_sessions'] == 0
+
+
+def test_put_returns_replaced_expired_session(store, clock):
+    old = make_project(1)
+    store.put(1, old)
+
+    clock.now += IDLE_TIMEOUT
+    new = make_project(1, files=0)
+    assert store.put(1, new) is old
+    assert store.get(1) is new
+    assert store.evict_expired() == []
+
+
+def test_put_returns_none_for_new_user(store):
+    assert store.put(1, make_project(1)) is None
+
+
+def test_spill_and_reload(tmp_path, clock):
+    projects = [make_project(user_id) for user_id in range(3)]
+    store = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=resident_size(*projects[:2]),
+                         spill_folder=str(tmp_path))
+    for user_id, project in enumerate(projects):
+        store.put(user_id, project)
+
+    # the least recently used session went to disk
+    stats = store.stats()
+    assert stats['resident_sessions'] == 2
+    assert stats['spilled_sessions'] == 1
+    assert os.listdir(tmp_path) == ['0.bson']
+
+    reloaded = store.get(0)
+    assert reloaded.project_id == projects[0].project_id
+    assert [file.name for file in reloaded.files] == [file.name for file in projects[0].files]
+    assert reloaded.files[0].local_path == projects[0].files[0].local_path
+
+    # loading it back spilled the next least recently used one
+    assert os.listdir(tmp_path) == ['1.bson']
+    assert store.stats()['spilled_sessions'] == 1
+
+
+def test_expired_spilled_session_is_evicted(tmp_path, clock):
+    projects = [make_project(user_id) for user_id in range(2)]
+    store = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=resident_size(projects[0]),
+                         spill_folder=str(tmp_path))
+    for user_id, project in enumerate(projects):
+        store.put(user_id, project)
+
+    clock.now += IDLE_TIMEOUT
+    evicted = store.evict_expired()
+    assert sorted(project.user_id for project in evicted) == [0, 1]
+    assert os.listdir(tmp_path) == []
+    assert store.stats() == {'resident_sessions': 0, 'resident_bytes': 0, 'spilled_sessions': 0, 'spilled_bytes': 0}
+
+
+def test_stats_byte_accounting(tmp_path, clock):
+    first, second = make_project(1), make_project(2)
+    store = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=resident_size(first), spill_folder=str(tmp_path))
+
+    store.put(1, first)
+    assert store.stats()['resident_bytes'] == resident_size(first)
+
+    # growing a session is re-measured on touch
+    first.files.append(FileMetadata('extra', 'extra.pdf', 'application/pdf', 1, 'document'))
+    store.touch(1)
+    assert store.stats()['resident_bytes'] == resident_size(first)
+
+    store.put(2, second)
+    stats = store.stats()
+    assert stats['resident_bytes'] == resident_size(second)
+    assert stats['spilled_bytes'] == resident_size(first)
+
+    store.pop(1)
+    store.pop(2)
+    assert store.stats() == {'resident_sessions': 0, 'resident_bytes': 0, 'spilled_sessions': 0, 'spilled_bytes': 0}
+
+
+def test_open_adopts_sessions_of_previous_process(tmp_path, clock):
+    projects = [make_project(user_id) for user_id in range(2)]
+    previous = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=0, spill_folder=str(tmp_path))
+    for user_id, project in enumerate(projects):
+        previous.put(user_id, project)
+    assert os.listdir(tmp_path) == ['0.bson']  # the most recently used one stays resident
+
+    store = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=1024 * 1024, spill_folder=str(tmp_path))
+    assert store.open() == 1
+    assert store.stats()['spilled_sessions'] == 1
+
+    # adopted sessions expire like any other, so their uploads get cleaned up
+    clock.now += IDLE_TIMEOUT
+    evicted = store.evict_expired()
+    assert [project.project_id for project in evicted] == [projects[0].project_id]
+    assert os.listdir(tmp_path) == []
+
+
+def test_unreadable_spill_file_does_not_stop_eviction(tmp_path, clock):
+    projects = [make_project(user_id) for user_id in range(3)]
+    store = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=resident_size(projects[0]),
+                         spill_folder=str(tmp_path))
+    for user_id, project in enumerate(projects):
+        store.put(user_id, project)
+    os.remove(tmp_path / '0.bson')
+
+    clock.now += IDLE_TIMEOUT
+    evicted = store.evict_expired()
+    assert sorted(project.user_id for project in evicted) == [1, 2]
+    assert len(store) == 0
+    assert store.stats() == {'resident_sessions': 0, 'resident_bytes': 0, 'spilled_sessions': 0, 'spilled_bytes': 0}
+
+
+def test_spill_all_and_reopen(tmp_path, clock):
+    projects = [make_project(user_id) for user_id in range(3)]
+    store = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=1024 * 1024, spill_folder=str(tmp_path))
+    for user_id, project in enumerate(projects):
+        store.put(user_id, project)
+
+    assert store.spill_all() == 3
+    assert store.stats()['resident_sessions'] == 0
+    assert store.stats()['spilled_bytes'] == resident_size(*projects)
+
+    restarted = SessionStore(idle_timeout=IDLE_TIMEOUT, max_bytes=1024 * 1024, spill_folder=str(tmp_path))
+    assert restarted.open() == 3
+    assert restarted.get(2).project_id == projects[2].project_id
+    assert restarted.stats()['resident_bytes'] == resident_size(projects[2])